@@ -0,0 +1,239 @@
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# getaddrinfo errors that mean the name really does not exist
+_NEGATIVE_ERRNOS = {
+    code for code in (
+        getattr(socket, 'EAI_NONAME', None),
+        getattr(socket, 'EAI_NODATA', None),
+    )
+    if code is not None
+}
+
+
+class HostGuard:
+    """
+    Host-level layer in front of link liveness checks.
+
+    Caches DNS results (including NXDOMAIN), trips a per-host circuit
+    breaker once a host keeps failing, and spaces out requests per host.
+
+    The breaker looks at the last `window_size` outcomes per host, so a
+    host that worked earlier and then goes dead still trips it.
+
+    Per-host state is capped at `max_hosts` entries (least recently used
+    first, preferring closed hosts), so a long-running stream stays bounded.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(
+        self,
+        dns_ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        failure_threshold: int = 3,
+        failure_rate: float = 0.5,
+        reset_timeout: float = 60.0,
+        min_interval: float = 0.5,
+        window_size: int = 10,
+        max_hosts: int = 10_000,
+    ):
+        self.dns_ttl = dns_ttl
+        self.negative_ttl = negative_ttl
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.reset_timeout = reset_timeout
+        self.min_interval = min_interval
+        self.window_size = window_size
+        self.max_hosts = max_hosts
+
+        # host -> (expires_at, addresses); empty list means NXDOMAIN
+        self._dns_cache: Dict[str, Tuple[float, List[str]]] = OrderedDict()
+        # host -> breaker record
+        self._hosts: Dict[str, Dict] = OrderedDict()
+        self._last_request: Dict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'dns_hits': 0,
+            'dns_misses': 0,
+            'short_circuited': 0,
+        }
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Extract lowercase hostname (no port/credentials) from URL"""
+        try:
+            return (urlparse(url).hostname or '').lower()
+        except ValueError:
+            return ''
+
+    def resolve(self, host: str) -> Optional[List[str]]:
+        """
+        Resolve host, serving positive and negative answers from cache.
+
+        The addresses are not handed to `requests`, which resolves again on
+        its own, so the real saving is the negative cache: dead domains skip
+        the lookup and connect timeout entirely. Positive entries only spare
+        repeated prechecks for URLs on the same host.
+
+        Returns:
+            Addresses, an empty list for NXDOMAIN, or None if the lookup
+            failed temporarily (not cached)
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._dns_cache.get(host)
+            if cached and cached[0] > now:
+                self._counters['dns_hits'] += 1
+                self._dns_cache.move_to_end(host)
+                return cached[1]
+            if cached:
+                del self._dns_cache[host]
+            self._counters['dns_misses'] += 1
+
+        try:
+            infos = socket.getaddrinfo(host, None)
+            addresses = sorted({info[4][0] for info in infos})
+        except socket.gaierror as e:
+            if e.errno not in _NEGATIVE_ERRNOS:
+                # Temporary failure (e.g. EAI_AGAIN); don't mark host dead
+                return None
+            addresses = []
+        except UnicodeError:
+            addresses = []
+
+        ttl = self.dns_ttl if addresses else self.negative_ttl
+        with self._lock:
+            self._dns_cache[host] = (time.monotonic() + ttl, addresses)
+            while len(self._dns_cache) > self.max_hosts:
+                self._dns_cache.popitem(last=False)
+        return addresses
+
+    def _record(self, host: str) -> Dict:
+        record = self._hosts.get(host)
+        if record is not None:
+            self._hosts.move_to_end(host)
+            return record
+
+        record = {
+            'state': self.CLOSED,
+            'successes': 0,
+            'failures': 0,
+            'recent': deque(maxlen=self.window_size),  # True = failure
+            'probing': False,
+            'probe_started': 0.0,
+            'opened_at': 0.0,
+        }
+        self._hosts[host] = record
+        if len(self._hosts) > self.max_hosts:
+            # Forget the least recently used closed host; open ones carry
+            # the information we want to keep, so they go last
+            victim = next(
+                (h for h, r in self._hosts.items() if r['state'] == self.CLOSED),
+                next(iter(self._hosts)),
+            )
+            del self._hosts[victim]
+        return record
+
+    def allow(self, host: str) -> bool:
+        """Check whether a request to host may proceed through the breaker"""
+        with self._lock:
+            record = self._record(host)
+            now = time.monotonic()
+            if record['state'] == self.OPEN:
+                if now - record['opened_at'] < self.reset_timeout:
+                    self._counters['short_circuited'] += 1
+                    return False
+                record['state'] = self.HALF_OPEN
+            if record['state'] == self.HALF_OPEN:
+                if record['probing'] and now - record['probe_started'] < self.reset_timeout:
+                    # Probe still in flight; hold everyone else back
+                    self._counters['short_circuited'] += 1
+                    return False
+                # Let a single probe through; an unreported one expires
+                # after reset_timeout
+                record['probing'] = True
+                record['probe_started'] = now
+            return True
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            record = self._record(host)
+            record['successes'] += 1
+            record['recent'].append(False)
+            if record['state'] == self.HALF_OPEN:
+                record['state'] = self.CLOSED
+                record['probing'] = False
+                record['recent'].clear()
+                record['recent'].append(False)
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            record = self._record(host)
+            record['failures'] += 1
+            recent = record['recent']
+            recent.append(True)
+            failures = sum(recent)
+            if record['state'] == self.HALF_OPEN or (
+                failures >= self.failure_threshold
+                and failures / len(recent) >= self.failure_rate
+            ):
+                record['state'] = self.OPEN
+                record['probing'] = False
+                record['opened_at'] = time.monotonic()
+
+    def wait_turn(self, host: str) -> None:
+        """Sleep as needed so requests to one host are min_interval apart"""
+        with self._lock:
+            now = time.monotonic()
+            ready_at = self._last_request.get(host, 0.0) + self.min_interval
+            start = max(now, ready_at)
+            self._last_request[host] = start
+            self._last_request.move_to_end(host)
+            while len(self._last_request) > self.max_hosts:
+                self._last_request.popitem(last=False)
+        if start > now:
+            time.sleep(start - now)
+
+    def precheck(self, url: str) -> Optional[str]:
+        """
+        Decide whether a URL is worth fetching.
+
+        Returns:
+            None if the request may proceed, otherwise the reason it was skipped
+        """
+        host = self.host_of(url)
+        if not host:
+            return 'invalid host'
+        if not self.allow(host):
+            return 'circuit open'
+        if self.resolve(host) == []:
+            self.record_failure(host)
+            return 'dns failure'
+        self.wait_turn(host)
+        return None
+
+    def stats(self) -> Dict:
+        """Snapshot of cache counters and per-host breaker state"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                **self._counters,
+                'dns_cached': sum(
+                    1 for expires_at, _ in self._dns_cache.values() if expires_at > now
+                ),
+                'hosts': {
+                    host: {
+                        'state': record['state'],
+                        'successes': record['successes'],
+                        'failures': record['failures'],
+                    }
+                    for host, record in self._hosts.items()
+                },
+            }
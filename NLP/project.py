@@ -1,10 +1,14 @@
 import re
 import requests
 from urllib.parse import urlparse
+from host_guard import HostGuard
 
 # List of trusted domains
 TRUSTED_DOMAINS = ['youtube.com', 'youtu.be', 'facebook.com', 'net25.tv']
 
+# Shared host-level DNS cache / circuit breaker for liveness checks
+HOST_GUARD = HostGuard()
+
 def extract_links(text):
     url_pattern = r'(https?://[^\s]+)'
     return re.findall(url_pattern, text)
@@ -13,16 +17,28 @@ def is_trusted_domain(url):
     domain = urlparse(url).netloc
     return any(trusted in domain for trusted in TRUSTED_DOMAINS)
 
-def is_link_active(url):
+def is_link_active(url, guard=HOST_GUARD):
+    # Skip dead or failing hosts without paying for DNS/connect timeouts
+    if guard.precheck(url) is not None:
+        return False
+    host = guard.host_of(url)
     try:
         # Try HEAD request first
         response = requests.head(url, allow_redirects=True, timeout=5)
         if response.status_code in [200, 301, 302]:
+            guard.record_success(host)
             return True
         # Fallback to GET if HEAD fails
+        guard.wait_turn(host)
         response = requests.get(url, allow_redirects=True, timeout=5)
+        # A 4xx still means the host is up; 5xx counts against it
+        if response.status_code >= 500:
+            guard.record_failure(host)
+        else:
+            guard.record_success(host)
         return response.status_code in [200, 301, 302]
     except requests.RequestException:
+        guard.record_failure(host)
         return False
 
 # === Input from user ===
@@ -58,3 +74,11 @@ for link in extracted_links:
         print("✅ Link is active.\n")
     else:
         print("❌ Link is broken or unreachable.\n")
+
+# === Host stats ===
+stats = HOST_GUARD.stats()
+print(f"📊 DNS cache: {stats['dns_hits']} hits, {stats['dns_misses']} misses, "
+      f"{stats['short_circuited']} short-circuited")
+for host, info in stats['hosts'].items():
+    print(f"- {host}: {info['state']} "
+          f"({info['successes']} ok / {info['failures']} failed)")
@@ -1,6 +1,7 @@
 import re
 from urllib.parse import urlparse, urlunparse
-from typing import List, Dict, Set, Union
+from typing import List, Dict, Optional, Set, Union
+from stream_stats import StreamStats
 
 class BantAILinkExtractor:
     """Enhanced URL extractor with social media profile detection"""
@@ -94,10 +95,23 @@ class BantAILinkExtractor:
         return list(set(urls))  # Remove duplicates
 
 
-def process_text_input(text: str, verified_pages: Set[str]) -> Dict:
-    """Processor for text with Facebook page detection"""
+def process_text_input(
+    text: str,
+    verified_pages: Set[str],
+    stream_stats: Optional[StreamStats] = None
+) -> Dict:
+    """Processor for text with Facebook page detection
+
+    If `stream_stats` is given, every link is recorded in it and marked in
+    'seen' when it (probably) appeared earlier in the stream. Seen links
+    are still verified here; skipping expensive checks for them (e.g.
+    project.is_link_active) is left to the caller.
+    """
     extractor = BantAILinkExtractor()
     found_links = extractor.extract_links(text)
+    seen = {}
+    if stream_stats is not None:
+        seen = {link: stream_stats.observe(link) for link in found_links}
     
     verification = {
         link: any(
@@ -111,7 +125,8 @@ def process_text_input(text: str, verified_pages: Set[str]) -> Dict:
         'original_text': text,
         'extracted_links': found_links,
         'verification': verification,
-        'all_verified': all(verification.values())
+        'all_verified': all(verification.values()),
+        'seen': seen
     }
 
 
@@ -0,0 +1,354 @@
+import base64
+import hashlib
+import heapq
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# First path segments on facebook.com that are routes, not page handles
+FACEBOOK_ROUTES = {
+    'events', 'friends', 'gaming', 'groups', 'hashtag', 'help', 'home.php',
+    'l.php', 'login', 'login.php', 'marketplace', 'messages', 'notifications',
+    'pages', 'people', 'permalink.php', 'photo', 'photo.php', 'photos',
+    'policies', 'privacy', 'reel', 'reels', 'search', 'settings', 'share',
+    'sharer', 'sharer.php', 'stories', 'story.php', 'video.php', 'watch',
+}
+
+
+def _hashes(item: str, count: int, modulus: int) -> List[int]:
+    """Derive `count` indexes in [0, modulus) via double hashing"""
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + i * h2) % modulus for i in range(count)]
+
+
+class WindowedBloomFilter:
+    """
+    Time-windowed Bloom filter for seen-URL dedup.
+
+    Keeps `generations` rotating bit arrays; an item is forgotten once
+    every generation it was added to has been rotated out.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        error_rate: float = 0.01,
+        window_seconds: float = 3600.0,
+        generations: int = 2,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window_seconds = window_seconds
+        self.generations = generations
+        # Lookups check every generation, so each one gets a tighter share
+        # of the error budget: 1 - (1 - p) ** (1 / g)
+        generation_error = 1 - (1 - error_rate) ** (1 / generations)
+        self.num_bits = max(8, int(-capacity * math.log(generation_error) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._filters = [bytearray((self.num_bits + 7) // 8) for _ in range(generations)]
+        self._rotated_at = time.time()
+
+    def _maybe_rotate(self) -> None:
+        span = self.window_seconds / self.generations
+        now = time.time()
+        elapsed = int((now - self._rotated_at) // span)
+        if elapsed <= 0:
+            return
+        for _ in range(min(elapsed, self.generations)):
+            self._filters.pop()
+            self._filters.insert(0, bytearray((self.num_bits + 7) // 8))
+        self._rotated_at += elapsed * span
+
+    def __contains__(self, item: str) -> bool:
+        self._maybe_rotate()
+        indexes = _hashes(item, self.num_hashes, self.num_bits)
+        return any(
+            all(bits[i >> 3] & (1 << (i & 7)) for i in indexes)
+            for bits in self._filters
+        )
+
+    def add(self, item: str) -> bool:
+        """Add item; returns True if it was (probably) already seen"""
+        seen = item in self
+        bits = self._filters[0]
+        for i in _hashes(item, self.num_hashes, self.num_bits):
+            bits[i >> 3] |= 1 << (i & 7)
+        return seen
+
+    def to_dict(self) -> Dict:
+        return {
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'window_seconds': self.window_seconds,
+            'generations': self.generations,
+            'rotated_at': self._rotated_at,
+            'filters': [base64.b64encode(bytes(bits)).decode('ascii') for bits in self._filters],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'WindowedBloomFilter':
+        bloom = cls(data['capacity'], data['error_rate'],
+                    data['window_seconds'], data['generations'])
+        bloom._rotated_at = data['rotated_at']
+        filters = [bytearray(base64.b64decode(bits)) for bits in data['filters']]
+        if any(len(bits) != (bloom.num_bits + 7) // 8 for bits in filters):
+            raise ValueError("Bloom filter snapshot does not match its configured size")
+        bloom._filters = filters
+        return bloom
+
+
+class CountMinSketch:
+    """Count-Min sketch with a bounded top-k heavy-hitter list
+
+    top_k=0 disables heavy-hitter tracking.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, top_k: int = 20):
+        if width < 1 or depth < 1 or top_k < 0:
+            raise ValueError("width and depth must be positive, top_k non-negative")
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self._table = [[0] * width for _ in range(depth)]
+        # item -> estimated count, never more than top_k entries
+        self._heavy: Dict[str, int] = {}
+
+    def add(self, item: str, count: int = 1) -> int:
+        """Increment item and return its new estimated count"""
+        estimate = None
+        for row, i in enumerate(_hashes(item, self.depth, self.width)):
+            self._table[row][i] += count
+            value = self._table[row][i]
+            estimate = value if estimate is None else min(estimate, value)
+
+        if not self.top_k:
+            pass
+        elif item in self._heavy or len(self._heavy) < self.top_k:
+            self._heavy[item] = estimate
+        else:
+            weakest = min(self._heavy, key=self._heavy.get)
+            if estimate > self._heavy[weakest]:
+                del self._heavy[weakest]
+                self._heavy[item] = estimate
+        return estimate
+
+    def estimate(self, item: str) -> int:
+        return min(
+            self._table[row][i]
+            for row, i in enumerate(_hashes(item, self.depth, self.width))
+        )
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Heaviest items seen so far, largest first"""
+        n = self.top_k if n is None else n
+        return heapq.nlargest(n, self._heavy.items(), key=lambda kv: kv[1])
+
+    def to_dict(self) -> Dict:
+        return {
+            'width': self.width,
+            'depth': self.depth,
+            'top_k': self.top_k,
+            'table': self._table,
+            'heavy': self._heavy,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CountMinSketch':
+        sketch = cls(data['width'], data['depth'], data['top_k'])
+        sketch._table = data['table']
+        sketch._heavy = dict(data['heavy'])
+        return sketch
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2**precision registers"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self._registers = bytearray(self.num_registers)
+
+    def add(self, item: str) -> None:
+        value = int.from_bytes(
+            hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little'
+        )
+        index = value & (self.num_registers - 1)
+        rest = value >> self.precision
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def count(self) -> int:
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+    def to_dict(self) -> Dict:
+        return {
+            'precision': self.precision,
+            'registers': base64.b64encode(bytes(self._registers)).decode('ascii'),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HyperLogLog':
+        hll = cls(data['precision'])
+        hll._registers = bytearray(base64.b64decode(data['registers']))
+        return hll
+
+
+class StreamStats:
+    """
+    Optional fixed-memory statistics stage for streams of extracted links.
+
+    Tracks seen URLs, trending domains and Facebook handles, and distinct
+    counts, snapshotting to disk every `snapshot_interval` seconds. Call
+    `close()` on shutdown to flush the latest state.
+
+    An existing snapshot is loaded on start; it must have been written with
+    the same sizes, otherwise ValueError is raised.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: Optional[str] = None,
+        snapshot_interval: float = 300.0,
+        bloom_capacity: int = 100_000,
+        bloom_error_rate: float = 0.01,
+        window_seconds: float = 3600.0,
+        cms_width: int = 2048,
+        cms_depth: int = 4,
+        top_k: int = 20,
+        hll_precision: int = 12,
+    ):
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.seen_urls = WindowedBloomFilter(bloom_capacity, bloom_error_rate, window_seconds)
+        self.domains = CountMinSketch(cms_width, cms_depth, top_k)
+        self.facebook_handles = CountMinSketch(cms_width, cms_depth, top_k)
+        self.distinct_urls = HyperLogLog(hll_precision)
+        self.distinct_domains = HyperLogLog(hll_precision)
+        self._last_snapshot = time.time()
+
+        if snapshot_path and os.path.exists(snapshot_path):
+            self._load(snapshot_path)
+
+    def observe(self, url: str) -> bool:
+        """
+        Record a URL in every sketch.
+
+        Malformed URLs are still counted as URLs but skip the domain and
+        handle sketches.
+
+        Returns:
+            True if the URL was (probably) already seen within the window
+        """
+        seen = self.seen_urls.add(url)
+        self.distinct_urls.add(url)
+
+        try:
+            parsed = urlparse(url.lower())
+            # hostname drops userinfo and port (facebook.com@evil.xyz:8080)
+            domain = parsed.hostname or ''
+        except ValueError:
+            domain = ''
+        if domain.startswith('www.'):
+            domain = domain[4:]
+
+        if domain:
+            self.domains.add(domain)
+            self.distinct_domains.add(domain)
+        if domain == 'facebook.com' or domain.endswith('.facebook.com'):
+            handle = self._facebook_handle(parsed)
+            if handle:
+                self.facebook_handles.add(handle)
+
+        self._maybe_snapshot()
+        return seen
+
+    @staticmethod
+    def _facebook_handle(parsed) -> Optional[str]:
+        """Page handle from a parsed facebook.com URL, if it names one"""
+        segment = parsed.path.strip('/').split('/')[0]
+        if segment == 'profile.php':
+            ids = parse_qs(parsed.query).get('id')
+            return ids[0] if ids else None
+        if not segment or segment in FACEBOOK_ROUTES:
+            return None
+        return segment
+
+    def report(self) -> Dict:
+        return {
+            'distinct_urls': self.distinct_urls.count(),
+            'distinct_domains': self.distinct_domains.count(),
+            'top_domains': self.domains.top(),
+            'top_facebook_handles': self.facebook_handles.top(),
+        }
+
+    def close(self) -> None:
+        """Flush a final snapshot"""
+        self.snapshot()
+
+    def _maybe_snapshot(self) -> None:
+        if self.snapshot_path and time.time() - self._last_snapshot >= self.snapshot_interval:
+            self.snapshot()
+
+    def snapshot(self, path: Optional[str] = None) -> None:
+        """Write all sketches to disk atomically"""
+        path = path or self.snapshot_path
+        if not path:
+            return
+        data = {
+            'saved_at': time.time(),
+            'seen_urls': self.seen_urls.to_dict(),
+            'domains': self.domains.to_dict(),
+            'facebook_handles': self.facebook_handles.to_dict(),
+            'distinct_urls': self.distinct_urls.to_dict(),
+            'distinct_domains': self.distinct_domains.to_dict(),
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        self._last_snapshot = time.time()
+
+    def _load(self, path: str) -> None:
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        # Refuse snapshots whose sizes differ from the configured ones
+        expected = {
+            ('seen_urls', 'capacity'): self.seen_urls.capacity,
+            ('seen_urls', 'error_rate'): self.seen_urls.error_rate,
+            ('seen_urls', 'window_seconds'): self.seen_urls.window_seconds,
+            ('seen_urls', 'generations'): self.seen_urls.generations,
+            ('domains', 'width'): self.domains.width,
+            ('domains', 'depth'): self.domains.depth,
+            ('domains', 'top_k'): self.domains.top_k,
+            ('facebook_handles', 'width'): self.facebook_handles.width,
+            ('facebook_handles', 'depth'): self.facebook_handles.depth,
+            ('facebook_handles', 'top_k'): self.facebook_handles.top_k,
+            ('distinct_urls', 'precision'): self.distinct_urls.precision,
+            ('distinct_domains', 'precision'): self.distinct_domains.precision,
+        }
+        for (name, key), value in expected.items():
+            if data[name][key] != value:
+                raise ValueError(
+                    f"Snapshot {path} has {name}.{key}={data[name][key]}, "
+                    f"config expects {value}"
+                )
+
+        self.seen_urls = WindowedBloomFilter.from_dict(data['seen_urls'])
+        self.domains = CountMinSketch.from_dict(data['domains'])
+        self.facebook_handles = CountMinSketch.from_dict(data['facebook_handles'])
+        self.distinct_urls = HyperLogLog.from_dict(data['distinct_urls'])
+        self.distinct_domains = HyperLogLog.from_dict(data['distinct_domains'])
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The NLP scripts import each other by bare module name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,181 @@
+import socket
+
+import pytest
+
+import host_guard
+from host_guard import HostGuard
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(host_guard.time, 'monotonic', fake)
+    return fake
+
+
+def make_resolver(monkeypatch, result):
+    calls = []
+
+    def fake_getaddrinfo(host, port):
+        calls.append(host)
+        if isinstance(result, Exception):
+            raise result
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (result, 0))]
+
+    monkeypatch.setattr(host_guard.socket, 'getaddrinfo', fake_getaddrinfo)
+    return calls
+
+
+def test_positive_answer_cached_until_ttl(monkeypatch, clock):
+    calls = make_resolver(monkeypatch, '93.184.216.34')
+    guard = HostGuard(dns_ttl=300)
+
+    assert guard.resolve('example.com') == ['93.184.216.34']
+    assert guard.resolve('example.com') == ['93.184.216.34']
+    assert len(calls) == 1
+
+    clock.now += 301
+    guard.resolve('example.com')
+    assert len(calls) == 2
+
+
+def test_nxdomain_cached_with_negative_ttl(monkeypatch, clock):
+    calls = make_resolver(monkeypatch, socket.gaierror(socket.EAI_NONAME, 'not known'))
+    guard = HostGuard(negative_ttl=60)
+
+    assert guard.resolve('dead.invalid') == []
+    assert guard.resolve('dead.invalid') == []
+    assert len(calls) == 1
+
+    clock.now += 61
+    guard.resolve('dead.invalid')
+    assert len(calls) == 2
+
+
+def test_temporary_dns_failure_not_cached(monkeypatch, clock):
+    calls = make_resolver(monkeypatch, socket.gaierror(socket.EAI_AGAIN, 'try again'))
+    guard = HostGuard(min_interval=0)
+
+    assert guard.resolve('flaky.example') is None
+    assert guard.precheck('https://flaky.example/') is None
+    assert len(calls) == 2
+    assert guard.stats()['hosts']['flaky.example']['failures'] == 0
+
+
+def test_dead_domain_short_circuits(monkeypatch, clock):
+    calls = make_resolver(monkeypatch, socket.gaierror(socket.EAI_NONAME, 'not known'))
+    guard = HostGuard(failure_threshold=3, min_interval=0)
+
+    reasons = [guard.precheck(f'http://scam.invalid/{i}') for i in range(5)]
+
+    assert reasons == ['dns failure'] * 3 + ['circuit open'] * 2
+    assert len(calls) == 1
+    assert guard.stats()['hosts']['scam.invalid']['state'] == HostGuard.OPEN
+
+
+def test_breaker_trips_after_host_goes_dead(clock):
+    guard = HostGuard(failure_threshold=3, failure_rate=0.5, window_size=10)
+    for _ in range(10):
+        guard.record_success('example.com')
+    for _ in range(4):
+        guard.record_failure('example.com')
+    assert guard.stats()['hosts']['example.com']['state'] == HostGuard.CLOSED
+
+    guard.record_failure('example.com')
+    assert guard.stats()['hosts']['example.com']['state'] == HostGuard.OPEN
+
+
+def test_half_open_lets_single_probe_through(clock):
+    guard = HostGuard(failure_threshold=1, failure_rate=0, reset_timeout=30)
+    guard.record_failure('example.com')
+    assert not guard.allow('example.com')
+
+    clock.now += 31
+    assert guard.allow('example.com')
+    assert not guard.allow('example.com')
+    assert not guard.allow('example.com')
+
+    guard.record_success('example.com')
+    assert guard.stats()['hosts']['example.com']['state'] == HostGuard.CLOSED
+    assert guard.allow('example.com')
+
+
+def test_failed_probe_reopens_breaker(clock):
+    guard = HostGuard(failure_threshold=1, failure_rate=0, reset_timeout=30)
+    guard.record_failure('example.com')
+    clock.now += 31
+    assert guard.allow('example.com')
+
+    guard.record_failure('example.com')
+    assert guard.stats()['hosts']['example.com']['state'] == HostGuard.OPEN
+    assert not guard.allow('example.com')
+
+
+def test_wait_turn_spaces_requests(monkeypatch, clock):
+    sleeps = []
+    monkeypatch.setattr(host_guard.time, 'sleep', sleeps.append)
+    guard = HostGuard(min_interval=0.5)
+
+    guard.wait_turn('example.com')
+    guard.wait_turn('example.com')
+    guard.wait_turn('other.com')
+
+    assert sleeps == [0.5]
+
+
+def test_host_of_strips_port_and_case():
+    assert HostGuard.host_of('https://User@Example.COM:8443/path') == 'example.com'
+    assert HostGuard.host_of('not a url') == ''
+
+
+def test_unreported_probe_expires(clock):
+    guard = HostGuard(failure_threshold=1, failure_rate=0, reset_timeout=30)
+    guard.record_failure('example.com')
+    clock.now += 31
+    assert guard.allow('example.com')
+    assert not guard.allow('example.com')
+
+    clock.now += 31
+    assert guard.allow('example.com')
+    assert not guard.allow('example.com')
+    assert guard.stats()['hosts']['example.com']['state'] == HostGuard.HALF_OPEN
+
+
+def test_expired_dns_entries_not_counted(monkeypatch, clock):
+    make_resolver(monkeypatch, '93.184.216.34')
+    guard = HostGuard(dns_ttl=300)
+    guard.resolve('a.example')
+    guard.resolve('b.example')
+    assert guard.stats()['dns_cached'] == 2
+
+    clock.now += 301
+    assert guard.stats()['dns_cached'] == 0
+    guard.resolve('a.example')
+    assert guard.stats()['dns_cached'] == 1
+    assert len(guard._dns_cache) == 2
+
+
+def test_host_maps_are_capped(monkeypatch, clock):
+    make_resolver(monkeypatch, '93.184.216.34')
+    monkeypatch.setattr(host_guard.time, 'sleep', lambda seconds: None)
+    guard = HostGuard(max_hosts=3, min_interval=0, failure_threshold=1, failure_rate=0)
+    guard.record_failure('dead.example')
+
+    for i in range(10):
+        assert guard.precheck(f'https://host{i}.example/') is None
+
+    assert len(guard._dns_cache) == 3
+    assert len(guard._last_request) == 3
+    hosts = guard.stats()['hosts']
+    assert len(hosts) == 3
+    # Open hosts outlive closed ones
+    assert hosts['dead.example']['state'] == HostGuard.OPEN
+    assert 'host9.example' in hosts
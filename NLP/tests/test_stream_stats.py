@@ -0,0 +1,184 @@
+import pytest
+
+import stream_stats
+from project3 import process_text_input
+from stream_stats import CountMinSketch, HyperLogLog, StreamStats, WindowedBloomFilter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(stream_stats.time, 'time', fake)
+    return fake
+
+
+def test_bloom_remembers_within_window(clock):
+    bloom = WindowedBloomFilter(capacity=1000, window_seconds=100, generations=2)
+
+    assert bloom.add('https://example.com/a') is False
+    assert bloom.add('https://example.com/a') is True
+    assert 'https://example.com/b' not in bloom
+
+
+def test_bloom_forgets_after_window(clock):
+    bloom = WindowedBloomFilter(capacity=1000, window_seconds=100, generations=2)
+    bloom.add('https://example.com/a')
+
+    clock.now += 60
+    assert 'https://example.com/a' in bloom
+
+    clock.now += 60
+    assert 'https://example.com/a' not in bloom
+
+
+def test_bloom_false_positive_rate(clock):
+    bloom = WindowedBloomFilter(capacity=5000, error_rate=0.01, window_seconds=100)
+    # Fill both generations to capacity
+    for i in range(5000):
+        bloom.add(f'https://old.example/{i}')
+    clock.now += 50
+    for i in range(5000):
+        bloom.add(f'https://seen.example/{i}')
+
+    false_positives = sum(f'https://new.example/{i}' in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.01 + 0.002
+
+
+def test_count_min_top_k():
+    sketch = CountMinSketch(width=512, depth=4, top_k=3)
+    for i in range(200):
+        sketch.add(f'noise{i}.com')
+    for _ in range(50):
+        sketch.add('scam.xyz')
+    for _ in range(30):
+        sketch.add('phish.top')
+
+    top = sketch.top()
+    assert [item for item, _ in top[:2]] == ['scam.xyz', 'phish.top']
+    assert sketch.estimate('scam.xyz') >= 50
+    assert sketch.top(1) == top[:1]
+    assert sketch.top(0) == []
+
+
+def test_count_min_without_top_k():
+    sketch = CountMinSketch(top_k=0)
+    assert sketch.add('example.com') == 1
+    assert sketch.top() == []
+
+    with pytest.raises(ValueError):
+        CountMinSketch(top_k=-1)
+
+
+@pytest.mark.parametrize('n', [0, 100, 50_000])
+def test_hyperloglog_accuracy(n):
+    hll = HyperLogLog(precision=12)
+    for i in range(n):
+        hll.add(f'item-{i}')
+        hll.add(f'item-{i}')
+
+    assert abs(hll.count() - n) <= max(2, 0.05 * n)
+
+
+def test_facebook_handles_ignore_lookalike_domains(clock):
+    stats = StreamStats()
+    stats.observe('https://www.facebook.com/NET25TV')
+    stats.observe('https://m.facebook.com/NET25TV/posts/1')
+    stats.observe('https://secure-facebook.com/login')
+
+    assert stats.report()['top_facebook_handles'] == [('net25tv', 2)]
+
+
+def test_domains_ignore_userinfo_and_port(clock):
+    stats = StreamStats()
+    stats.observe('https://user@scam.xyz:8080/a')
+    stats.observe('https://www.scam.xyz/b')
+    stats.observe('https://facebook.com@evil.xyz/login')
+
+    report = stats.report()
+    assert dict(report['top_domains']) == {'scam.xyz': 2, 'evil.xyz': 1}
+    assert report['distinct_domains'] == 2
+    assert report['top_facebook_handles'] == []
+
+
+def test_malformed_url_counts_only_as_url(clock):
+    stats = StreamStats()
+
+    assert stats.observe('http://[bad') is False
+    assert stats.observe('http://[bad') is True
+    report = stats.report()
+    assert report['distinct_urls'] == 1
+    assert report['distinct_domains'] == 0
+    assert report['top_domains'] == []
+
+
+def test_facebook_routes_are_not_handles(clock):
+    stats = StreamStats()
+    for url in [
+        'https://www.facebook.com/profile.php?id=1',
+        'https://www.facebook.com/profile.php?id=2',
+        'https://www.facebook.com/profile.php?id=2',
+        'https://www.facebook.com/profile.php',
+        'https://www.facebook.com/groups/123/',
+        'https://www.facebook.com/watch?v=9',
+        'https://www.facebook.com/share/abc',
+        'https://www.facebook.com/people/Some-Name/100/',
+        'https://www.facebook.com/story.php?story_fbid=1',
+        'https://www.facebook.com/',
+    ]:
+        stats.observe(url)
+
+    assert stats.report()['top_facebook_handles'] == [('2', 2), ('1', 1)]
+
+
+def test_snapshot_round_trip(tmp_path, clock):
+    path = str(tmp_path / 'stats.json')
+    stats = StreamStats(snapshot_path=path, cms_width=256, hll_precision=8)
+    for i in range(20):
+        stats.observe(f'https://scam.xyz/{i}')
+    stats.observe('https://www.facebook.com/NET25TV')
+    stats.close()
+
+    restored = StreamStats(snapshot_path=path, cms_width=256, hll_precision=8)
+    assert restored.report() == stats.report()
+    assert restored.observe('https://scam.xyz/3') is True
+
+
+def test_periodic_snapshot(tmp_path, clock):
+    path = tmp_path / 'stats.json'
+    stats = StreamStats(snapshot_path=str(path), snapshot_interval=10)
+    stats.observe('https://example.com/a')
+    assert not path.exists()
+
+    clock.now += 11
+    stats.observe('https://example.com/b')
+    assert path.exists()
+
+
+def test_snapshot_size_mismatch_raises(tmp_path, clock):
+    path = str(tmp_path / 'stats.json')
+    StreamStats(snapshot_path=path, cms_width=256).close()
+
+    with pytest.raises(ValueError, match='domains.width'):
+        StreamStats(snapshot_path=path, cms_width=512)
+
+
+def test_process_text_keeps_seen_links(clock):
+    stats = StreamStats()
+    post = "Login now https://evil.example/login"
+
+    first = process_text_input(post, {'NET25TV'}, stats)
+    second = process_text_input(post, {'NET25TV'}, stats)
+
+    assert first['seen'] == {'https://evil.example/login': False}
+    assert second['seen'] == {'https://evil.example/login': True}
+    assert second['extracted_links'] == ['https://evil.example/login']
+    assert second['verification'] == {'https://evil.example/login': False}
+    assert second['all_verified'] is False